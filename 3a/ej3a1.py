@@ -23,9 +23,24 @@ DB_PATH = ':memory:'
 def crear_conexion():
     """
     Crea y devuelve una conexión a la base de datos SQLite
+
+    La conexión se abre con PRAGMAs ajustados para mejorar el rendimiento
+    de escritura (WAL y sincronización relajada en bases de datos en archivo,
+    tablas temporales y caché en memoria en todos los casos).
     """
     # Implementa la creación de la conexión y retorna el objeto conexión
-    conexion = sqlite3.connect(DB_PATH)
+    # cached_statements amplía la caché LRU de sentencias preparadas de
+    # sqlite3 (100 por defecto) para que el SQL repetido no se recompile
+    conexion = sqlite3.connect(DB_PATH, cached_statements=256)
+
+    # WAL y synchronous=NORMAL reducen los fsync por commit; solo tienen
+    # sentido en bases de datos en archivo (en ':memory:' no aplican)
+    if DB_PATH != ':memory:':
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+    conexion.execute("PRAGMA temp_store=MEMORY")
+    conexion.execute("PRAGMA cache_size=-65536")  # 64 MiB
+
     return conexion
 
 def crear_tablas(conexion):
@@ -54,25 +69,37 @@ def crear_tablas(conexion):
         )
     ''')
 
+    # SQLite no indexa automáticamente las claves foráneas: sin este índice
+    # los JOIN por autor recorren la tabla libros entera
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS ix_libros_autor_id ON libros (autor_id)
+    ''')
+
     conexion.commit()
 
-def insertar_autores(conexion, autores):
+def insertar_autores(conexion, autores, commit=True):
     """
     Inserta varios autores en la tabla 'autores'
     Parámetro autores: Lista de tuplas (nombre,)
+    Parámetro commit: Si es False, el commit queda en manos del llamador
+    (útil para agrupar varias cargas en una sola transacción)
     """
-    cursor = conexion.cursor()
-    cursor.executemany('INSERT INTO autores (nombre) VALUES (?)', autores)
-    conexion.commit()
+    # Connection.executemany usa un cursor implícito: no hace falta crear
+    # (y descartar) uno explícito para una sola sentencia
+    conexion.executemany('INSERT INTO autores (nombre) VALUES (?)', autores)
+    if commit:
+        conexion.commit()
 
-def insertar_libros(conexion, libros):
+def insertar_libros(conexion, libros, commit=True):
     """
     Inserta varios libros en la tabla 'libros'
     Parámetro libros: Lista de tuplas (titulo, anio, autor_id)
+    Parámetro commit: Si es False, el commit queda en manos del llamador
+    (útil para agrupar varias cargas en una sola transacción)
     """
-    cursor = conexion.cursor()
-    cursor.executemany('INSERT INTO libros (titulo, anio, autor_id) VALUES (?, ?, ?)', libros)
-    conexion.commit()
+    conexion.executemany('INSERT INTO libros (titulo, anio, autor_id) VALUES (?, ?, ?)', libros)
+    if commit:
+        conexion.commit()
 
 def consultar_libros(conexion):
     """
@@ -84,9 +111,12 @@ def consultar_libros(conexion):
         FROM libros
         JOIN autores ON libros.autor_id = autores.id
     ''')
-    resultados = cursor.fetchall()
-    for titulo, anio, autor in resultados:
-        print(f"- {titulo} ({anio}) - {autor}")
+    # Formatear directamente desde el cursor y emitir un único print:
+    # evita la lista intermedia y una llamada a print por fila
+    salida = "\n".join(f"- {titulo} ({anio}) - {autor}"
+                       for titulo, anio, autor in cursor)
+    if salida:
+        print(salida)
 
 def buscar_libros_por_autor(conexion, nombre_autor):
     """
@@ -101,27 +131,29 @@ def buscar_libros_por_autor(conexion, nombre_autor):
     ''', (nombre_autor,))
     return cursor.fetchall()
 
+# Sentencias UPDATE fijas: al reutilizar siempre el mismo texto SQL,
+# la caché de sentencias preparadas de sqlite3 evita recompilarlas
+_SQL_ACTUALIZAR_TITULO = "UPDATE libros SET titulo = ? WHERE id = ?"
+_SQL_ACTUALIZAR_ANIO = "UPDATE libros SET anio = ? WHERE id = ?"
+_SQL_ACTUALIZAR_AMBOS = "UPDATE libros SET titulo = ?, anio = ? WHERE id = ?"
+
 def actualizar_libro(conexion, id_libro, nuevo_titulo=None, nuevo_anio=None):
     """
     Actualiza la información de un libro existente
     """
     cursor = conexion.cursor()
-    campos = []
-    valores = []
-
-    if nuevo_titulo is not None:
-        campos.append("titulo = ?")
-        valores.append(nuevo_titulo)
-    if nuevo_anio is not None:
-        campos.append("anio = ?")
-        valores.append(nuevo_anio)
 
-    if not campos:
+    # Despacho a una de las tres sentencias canónicas en lugar de
+    # construir el SQL con f-strings (que anularía la caché)
+    if nuevo_titulo is not None and nuevo_anio is not None:
+        cursor.execute(_SQL_ACTUALIZAR_AMBOS, (nuevo_titulo, nuevo_anio, id_libro))
+    elif nuevo_titulo is not None:
+        cursor.execute(_SQL_ACTUALIZAR_TITULO, (nuevo_titulo, id_libro))
+    elif nuevo_anio is not None:
+        cursor.execute(_SQL_ACTUALIZAR_ANIO, (nuevo_anio, id_libro))
+    else:
         return
 
-    valores.append(id_libro)
-    set_clause = ", ".join(campos)
-    cursor.execute(f"UPDATE libros SET {set_clause} WHERE id = ?", valores)
     conexion.commit()
 
 def eliminar_libro(conexion, id_libro):
@@ -160,16 +192,12 @@ if __name__ == "__main__":
         print("Creando tablas...")
         crear_tablas(conexion)
 
-        # Insertar autores
+        # Datos de ejemplo
         autores = [
             ("Gabriel García Márquez",),
             ("Isabel Allende",),
             ("Jorge Luis Borges",)
         ]
-        insertar_autores(conexion, autores)
-        print("Autores insertados correctamente")
-
-        # Insertar libros
         libros = [
             ("Cien años de soledad", 1967, 1),
             ("El amor en los tiempos del cólera", 1985, 1),
@@ -178,7 +206,13 @@ if __name__ == "__main__":
             ("Ficciones", 1944, 3),
             ("El Aleph", 1949, 3)
         ]
-        insertar_libros(conexion, libros)
+
+        # Cargar autores y libros en una única transacción
+        # (el bloque 'with' hace BEGIN/COMMIT implícitos)
+        with conexion:
+            insertar_autores(conexion, autores, commit=False)
+            insertar_libros(conexion, libros, commit=False)
+        print("Autores insertados correctamente")
         print("Libros insertados correctamente")
 
         print("\n--- Lista de todos los libros con sus autores ---")
@@ -15,7 +15,15 @@ import sqlite3
 import pandas as pd
 import os
 import json
-from typing import List, Dict, Any, Optional, Tuple, Union
+import orjson
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# connectorx lee SQL con un motor en Rust (sin pasar fila a fila por Python);
+# si no está disponible en la plataforma se usa pandas.read_sql_query
+try:
+    import connectorx as cx
+except ImportError:
+    cx = None
 
 # Ruta a la base de datos SQLite
 DB_PATH = os.path.join(os.path.dirname(__file__), 'ventas_comerciales.db')
@@ -40,6 +48,72 @@ def conectar_bd() -> sqlite3.Connection:
     # Retorna la conexión
     return conexion
 
+def _listar_tablas(conexion: sqlite3.Connection) -> List[str]:
+    """
+    Devuelve los nombres de las tablas de usuario de la base de datos
+
+    Usa PRAGMA table_list (SQLite >= 3.37) filtrando el esquema 'main' y
+    las tablas internas sqlite_*, de modo que los consumidores no lancen
+    consultas sobre tablas de sistema como sqlite_sequence.
+    """
+    cursor = conexion.cursor()
+    cursor.execute(
+        "SELECT name FROM pragma_table_list "
+        "WHERE schema='main' AND type='table' AND name NOT LIKE 'sqlite_%'"
+    )
+    return [fila[0] for fila in cursor.fetchall()]
+
+def iter_tablas(conexion: sqlite3.Connection) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+    """
+    Genera pares (nombre_tabla, iterador de registros) para cada tabla
+
+    Los registros se leen de forma perezosa desde SQLite, de modo que el
+    consumidor puede procesar tabla a tabla sin materializar toda la base
+    de datos en memoria.
+
+    Args:
+        conexion (sqlite3.Connection): Conexión a la base de datos SQLite
+
+    Yields:
+        Tuple[str, Iterator[Dict[str, Any]]]: Nombre de la tabla y un
+        iterador de sus registros como diccionarios
+    """
+    for nombre in _listar_tablas(conexion):
+        cursor_tabla = conexion.cursor()
+        cursor_tabla.row_factory = sqlite3.Row
+        cursor_tabla.execute(f'SELECT * FROM "{nombre}"')
+        yield nombre, (dict(fila) for fila in cursor_tabla)
+
+def exportar_a_json(conexion: sqlite3.Connection, ruta: str) -> None:
+    """
+    Exporta todas las tablas de la base de datos a un archivo JSON
+
+    A diferencia de convertir_a_json + json.dump, escribe el archivo en
+    streaming (tabla a tabla y registro a registro) con orjson, por lo que
+    nunca mantiene en memoria más de un registro a la vez.
+
+    Args:
+        conexion (sqlite3.Connection): Conexión a la base de datos SQLite
+        ruta (str): Ruta del archivo JSON de salida
+    """
+    with open(ruta, 'wb') as f:
+        f.write(b'{')
+        primera_tabla = True
+        for nombre, registros in iter_tablas(conexion):
+            if not primera_tabla:
+                f.write(b',')
+            primera_tabla = False
+            f.write(orjson.dumps(nombre))
+            f.write(b':[')
+            primer_registro = True
+            for registro in registros:
+                if not primer_registro:
+                    f.write(b',')
+                primer_registro = False
+                f.write(orjson.dumps(registro))
+            f.write(b']')
+        f.write(b'}')
+
 def convertir_a_json(conexion: sqlite3.Connection) -> Dict[str, List[Dict[str, Any]]]:
     """
     Convierte los datos de la base de datos en un objeto compatible con JSON
@@ -53,96 +127,131 @@ def convertir_a_json(conexion: sqlite3.Connection) -> Dict[str, List[Dict[str, A
     """
     cursor = conexion.cursor()
 
+    # sqlite3.Row es un mapeo implementado en C: convertir cada fila con
+    # dict(fila) evita el bucle Python por celda (O(filas*columnas))
+    cursor.row_factory = sqlite3.Row
+
     # Crea un diccionario vacío para almacenar el resultado
     resultado = {}
 
-    # Obtén la lista de tablas de la base de datos
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tablas = cursor.fetchall()
-
-    for tabla in tablas:
-        nombre_tabla = tabla[0]
-
-        # Ejecuta una consulta SELECT * FROM tabla
-        cursor.execute(f"SELECT * FROM {nombre_tabla}")
-        filas = cursor.fetchall()
-
-        # Obtén los nombres de las columnas
-        columnas = [descripcion[0] for descripcion in cursor.description]
-
-        # Convierte cada fila a un diccionario (clave: nombre columna, valor: valor celda)
-        registros = []
-        for fila in filas:
-            registro = {}
-            for i, valor in enumerate(fila):
-                registro[columnas[i]] = valor
-            registros.append(registro)
-
-        # Añade el diccionario a una lista para esa tabla
-        resultado[nombre_tabla] = registros
+    # Para cada tabla de usuario, ejecuta SELECT * y convierte cada fila
+    # a un diccionario (clave: nombre columna, valor: valor celda).
+    # Se itera el cursor directamente: fetchall() crearía una lista
+    # intermedia de tuplas que se descartaría justo después
+    for nombre_tabla in _listar_tablas(conexion):
+        cursor.execute(f'SELECT * FROM "{nombre_tabla}"')
+        resultado[nombre_tabla] = [dict(fila) for fila in cursor]
 
     # Retorna el diccionario completo con todas las tablas
     return resultado
 
-def convertir_a_dataframes(conexion: sqlite3.Connection) -> Dict[str, pd.DataFrame]:
+def _compactar_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce en el propio DataFrame el ancho de los dtypes por defecto
+
+    pandas carga los datos de SQL como int64/float64/object, que para una
+    base de datos analítica suele ser varias veces el tamaño necesario.
+    Las columnas enteras y flotantes se reducen al tipo más estrecho que
+    conserve los valores, y las columnas de texto con baja cardinalidad se
+    convierten a 'category'. Las columnas con dtypes Arrow se dejan tal
+    cual (ya son compactas).
+    """
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.ArrowDtype):
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            sin_negativos = bool((df[col] >= 0).all())
+            df[col] = pd.to_numeric(df[col], downcast='unsigned' if sin_negativos else 'integer')
+        elif pd.api.types.is_float_dtype(dtype):
+            df[col] = pd.to_numeric(df[col], downcast='float')
+        elif dtype == object:
+            num_unicos = df[col].nunique()
+            if len(df) > 0 and num_unicos / len(df) < 0.5:
+                df[col] = df[col].astype('category')
+    return df
+
+def _leer_sql(sql: str, conexion: sqlite3.Connection,
+              chunksize: Optional[int] = None) -> pd.DataFrame:
+    """
+    Ejecuta una consulta SELECT y devuelve el resultado como DataFrame
+
+    Si connectorx está disponible y la base de datos está en archivo, la
+    consulta se lee con su motor nativo a Arrow y se convierte a pandas con
+    dtypes Arrow (sin construir los valores fila a fila en Python). En caso
+    contrario se usa pandas.read_sql_query sobre la conexión sqlite3 y se
+    compactan los dtypes resultantes; con chunksize, el resultado se lee
+    por bloques (cada bloque se compacta antes de concatenar) para acotar
+    el pico de memoria en resultados grandes.
+    """
+    if cx is not None and DB_PATH != ':memory:':
+        tabla = cx.read_sql(f"sqlite://{DB_PATH}", sql, return_type="arrow")
+        return tabla.to_pandas(types_mapper=pd.ArrowDtype)
+
+    if chunksize:
+        bloques = [_compactar_dtypes(bloque)
+                   for bloque in pd.read_sql_query(sql, conexion, chunksize=chunksize)]
+        if bloques:
+            return pd.concat(bloques, ignore_index=True)
+        # Sin filas: repetir la consulta sin chunks para conservar las columnas
+    return _compactar_dtypes(pd.read_sql_query(sql, conexion))
+
+def convertir_a_dataframes(conexion: sqlite3.Connection,
+                            chunksize: Optional[int] = 50_000) -> Dict[str, pd.DataFrame]:
     """
     Extrae los datos de la base de datos a DataFrames de pandas
 
     Args:
         conexion (sqlite3.Connection): Conexión a la base de datos SQLite
+        chunksize (Optional[int]): Tamaño de bloque para leer los resultados
+            por partes y acotar la memoria pico; None lee cada consulta entera
 
     Returns:
         Dict[str, pd.DataFrame]: Diccionario con DataFrames para cada tabla y para
         consultas combinadas relevantes
     """
-    cursor = conexion.cursor()
-
     # Crea un diccionario vacío para los DataFrames
     dataframes = {}
 
-    # Obtén la lista de tablas de la base de datos
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tablas = cursor.fetchall()
+    # Conjunto de tablas presentes: se consulta una sola vez y decide qué
+    # JOINs tiene sentido lanzar (antes un try/except silenciaba cualquier
+    # error, incluidos los que no eran "tabla inexistente")
+    presentes = set(_listar_tablas(conexion))
 
-    # Para cada tabla, crea un DataFrame usando pd.read_sql_query
-    for tabla in tablas:
-        nombre_tabla = tabla[0]
-        df = pd.read_sql_query(f"SELECT * FROM {nombre_tabla}", conexion)
+    # Para cada tabla de usuario, crea un DataFrame con _leer_sql
+    for nombre_tabla in presentes:
+        df = _leer_sql(f'SELECT * FROM "{nombre_tabla}"', conexion, chunksize=chunksize)
         dataframes[nombre_tabla] = df
 
-    # Añade consultas JOIN para relaciones importantes:
+    # Añade consultas JOIN para relaciones importantes.
+    # Las columnas se proyectan explícitamente (nada de v.*): así solo
+    # viajan por el driver las columnas que de verdad se usan y no se
+    # arrastran ids duplicados de ambos lados del JOIN
     # - Ventas con información de productos
-    try:
-        df_ventas_productos = pd.read_sql_query('''
-            SELECT v.*, p.nombre as producto_nombre, p.precio
+    if {'ventas', 'productos'} <= presentes:
+        dataframes['ventas_con_productos'] = _leer_sql('''
+            SELECT v.id, v.fecha, v.vendedor_id, v.producto_id, v.cantidad,
+                   p.nombre AS producto_nombre, p.precio_unitario AS precio
             FROM ventas v
             JOIN productos p ON v.producto_id = p.id
-        ''', conexion)
-        dataframes['ventas_con_productos'] = df_ventas_productos
-    except:
-        pass  # Ignorar si no existen las tablas
+        ''', conexion, chunksize=chunksize)
 
     # - Ventas con información de vendedores
-    try:
-        df_ventas_vendedores = pd.read_sql_query('''
-            SELECT v.*, ven.nombre as vendedor_nombre, ven.region_id
+    if {'ventas', 'vendedores'} <= presentes:
+        dataframes['ventas_con_vendedores'] = _leer_sql('''
+            SELECT v.id, v.fecha, v.vendedor_id, v.producto_id, v.cantidad,
+                   ven.nombre AS vendedor_nombre, ven.region_id
             FROM ventas v
             JOIN vendedores ven ON v.vendedor_id = ven.id
-        ''', conexion)
-        dataframes['ventas_con_vendedores'] = df_ventas_vendedores
-    except:
-        pass  # Ignorar si no existen las tablas
+        ''', conexion, chunksize=chunksize)
 
     # - Vendedores con regiones
-    try:
-        df_vendedores_regiones = pd.read_sql_query('''
-            SELECT ven.*, r.nombre as region_nombre
+    if {'vendedores', 'regiones'} <= presentes:
+        dataframes['vendedores_con_regiones'] = _leer_sql('''
+            SELECT ven.*, r.nombre AS region_nombre
             FROM vendedores ven
             JOIN regiones r ON ven.region_id = r.id
-        ''', conexion)
-        dataframes['vendedores_con_regiones'] = df_vendedores_regiones
-    except:
-        pass  # Ignorar si no existen las tablas
+        ''', conexion, chunksize=chunksize)
 
     # Retorna el diccionario con todos los DataFrames
     return dataframes
@@ -171,10 +280,10 @@ if __name__ == "__main__":
             if datos_json[primera_tabla]:
                 print(f"Primer registro: {datos_json[primera_tabla][0]}")
 
-            # Opcional: guardar los datos en un archivo JSON
+            # Opcional: guardar los datos en un archivo JSON en streaming
+            # (no materializa toda la base de datos en memoria)
             # ruta_json = os.path.join(os.path.dirname(__file__), 'ventas_comerciales.json')
-            # with open(ruta_json, 'w', encoding='utf-8') as f:
-            #     json.dump(datos_json, f, ensure_ascii=False, indent=2)
+            # exportar_a_json(conexion, ruta_json)
             # print(f"Datos guardados en {ruta_json}")
 
         # Conversión a DataFrames de pandas
@@ -14,6 +14,8 @@ Este ejercicio se enfoca en las operaciones básicas de MongoDB desde Python uti
 """
 
 import pymongo
+from pymongo import InsertOne
+from bson.objectid import ObjectId
 import subprocess
 import time
 import os
@@ -25,6 +27,26 @@ from typing import List, Dict, Any, Optional, Tuple, Union
 DB_NAME = "biblioteca"
 MONGODB_PORT = 27017
 
+# Cliente compartido a nivel de módulo: cada MongoClient mantiene su propio
+# pool de conexiones e hilos de monitorización, así que se crea una sola vez
+_cliente = None
+
+def _obtener_cliente() -> pymongo.MongoClient:
+    """
+    Devuelve el MongoClient compartido, creándolo en la primera llamada
+    """
+    global _cliente
+    if _cliente is None:
+        # compressors: el cliente negocia compresión del protocolo con el
+        # servidor (zstd preferido, zlib como alternativa universal); los
+        # campos de texto como titulo/nombre comprimen especialmente bien
+        _cliente = pymongo.MongoClient(
+            f"mongodb://localhost:{MONGODB_PORT}",
+            maxPoolSize=50,
+            compressors="zstd,zlib"
+        )
+    return _cliente
+
 def verificar_mongodb_instalado() -> bool:
     """
     Verifica si MongoDB está instalado en el sistema
@@ -51,19 +73,30 @@ def iniciar_mongodb_en_memoria() -> Optional[subprocess.Popen]:
     cmd = ["mongod", "--storageEngine", "inMemory", "--dbpath", temp_dir, "--port", str(MONGODB_PORT)]
 
     try:
+        # DEVNULL evita que el proceso se bloquee llenando el buffer de la
+        # tubería en ejecuciones largas
         proceso = subprocess.Popen(
             cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
             text=True
         )
 
-        # Dar tiempo para que MongoDB se inicie
-        time.sleep(2)
-
-        # Verificar que MongoDB se ha iniciado correctamente
-        if proceso.poll() is not None:
-            raise Exception("No se pudo iniciar MongoDB")
+        # Esperar a que el servidor acepte conexiones (hasta 5 s de reloj)
+        # en lugar de un sleep fijo: normalmente está listo en unos
+        # cientos de ms y solo se paga el arranque real
+        limite = time.monotonic() + 5
+        while time.monotonic() < limite:
+            # Verificar que MongoDB no ha muerto durante el arranque
+            if proceso.poll() is not None:
+                raise Exception("No se pudo iniciar MongoDB")
+            try:
+                with pymongo.MongoClient(f"mongodb://localhost:{MONGODB_PORT}",
+                                         serverSelectionTimeoutMS=100) as cliente:
+                    cliente.admin.command("ping")
+                break
+            except pymongo.errors.PyMongoError:
+                time.sleep(0.05)
 
         return proceso
     except Exception as e:
@@ -76,8 +109,8 @@ def crear_conexion() -> pymongo.database.Database:
     """
     Crea y devuelve una conexión a la base de datos MongoDB
     """
-    # Conectar al servidor MongoDB
-    cliente = pymongo.MongoClient(f"mongodb://localhost:{MONGODB_PORT}")
+    # Conectar al servidor MongoDB (cliente compartido, con pool propio)
+    cliente = _obtener_cliente()
     # Acceder a la base de datos
     db = cliente[DB_NAME]
     return db
@@ -93,10 +126,13 @@ def crear_colecciones(db: pymongo.database.Database) -> None:
     """
     # No es necesario crear colecciones explícitamente en MongoDB
     # Se crean automáticamente al insertar el primer documento
-    # Aquí solo creamos índices para optimizar consultas
+    # Aquí solo creamos índices para optimizar consultas.
+    # El índice compuesto (autor_id, titulo, anio) cubre la consulta de
+    # buscar_libros_por_autor: Mongo responde desde el índice sin tocar
+    # los documentos
     db["autores"].create_index("nombre")
     db["libros"].create_index("titulo")
-    db["libros"].create_index("autor_id")
+    db["libros"].create_index([("autor_id", 1), ("titulo", 1), ("anio", 1)])
 
 def insertar_autores(db: pymongo.database.Database, autores: List[Tuple[str]]) -> List[str]:
     """
@@ -107,7 +143,9 @@ def insertar_autores(db: pymongo.database.Database, autores: List[Tuple[str]]) -
         autores: Lista de tuplas (nombre,)
     """
     autores_docs = [{"nombre": nombre} for nombre, in autores]
-    resultado = db["autores"].insert_many(autores_docs)
+    # ordered=False permite al servidor paralelizar el lote y no abortar
+    # en el primer error
+    resultado = db["autores"].insert_many(autores_docs, ordered=False)
     return resultado.inserted_ids
 
 def insertar_libros(db: pymongo.database.Database, libros: List[Tuple[str, int, str]]) -> List[str]:
@@ -118,10 +156,44 @@ def insertar_libros(db: pymongo.database.Database, libros: List[Tuple[str, int,
         db: Objeto de conexión a la base de datos MongoDB
         libros: Lista de tuplas (titulo, anio, autor_id)
     """
-    libros_docs = [{"titulo": titulo, "anio": anio, "autor_id": autor_id} for titulo, anio, autor_id in libros]
-    resultado = db["libros"].insert_many(libros_docs)
+    # autor_id se guarda como ObjectId nativo (12 bytes) y no como su
+    # representación hexadecimal (24 bytes): claves de índice más pequeñas
+    # y comparaciones más rápidas en el $lookup
+    libros_docs = [
+        {"titulo": titulo, "anio": anio,
+         "autor_id": ObjectId(autor_id) if isinstance(autor_id, str) else autor_id}
+        for titulo, anio, autor_id in libros
+    ]
+    resultado = db["libros"].insert_many(libros_docs, ordered=False)
     return resultado.inserted_ids
 
+def _construir_pipeline(
+        match: Optional[Dict[str, Any]]=None,
+        etapas: Optional[List[Dict[str, Any]]]=None,
+        sort: Optional[Dict[str, int]]=None,
+        limit: Optional[int]=None,
+        project: Optional[Dict[str, Any]]=None
+) -> List[Dict[str, Any]]:
+    """
+    Construye un pipeline de agregación con el orden canónico de etapas:
+    $match primero (para que el servidor pueda usar los índices), después
+    las etapas intermedias ($lookup, $unwind...), luego $sort y $limit
+    (juntos permiten la optimización top-K sobre índice) y $project al
+    final, para no descartar campos antes de que $match pueda filtrarlos.
+    """
+    pipeline: List[Dict[str, Any]] = []
+    if match:
+        pipeline.append({"$match": match})
+    if etapas:
+        pipeline.extend(etapas)
+    if sort:
+        pipeline.append({"$sort": sort})
+    if limit:
+        pipeline.append({"$limit": limit})
+    if project:
+        pipeline.append({"$project": project})
+    return pipeline
+
 def consultar_libros(db: pymongo.database.Database) -> None:
     """
     Consulta todos los libros y muestra título, año y nombre del autor
@@ -129,11 +201,50 @@ def consultar_libros(db: pymongo.database.Database) -> None:
     Args:
         db: Objeto de conexión a la base de datos MongoDB
     """
-    # Hacer una consulta para obtener libros con sus autores
-    for libro in db["libros"].find():
-        autor = db["autores"].find_one({"_id": libro["autor_id"]})
-        autor_nombre = autor["nombre"] if autor else "Desconocido"
-        print(f"- {libro['titulo']} ({libro['anio']}) - {autor_nombre}")
+    # Hacer una consulta para obtener libros con sus autores:
+    # un único $lookup resuelve el join en el servidor en lugar de lanzar
+    # un find_one por libro (patrón N+1)
+    pipeline = _construir_pipeline(
+        etapas=[
+            {"$lookup": {
+                "from": "autores",
+                "localField": "autor_id",
+                "foreignField": "_id",
+                "as": "autor"
+            }},
+            {"$unwind": {"path": "$autor", "preserveNullAndEmptyArrays": True}}
+        ],
+        # _id: 0 evita enviar el ObjectId por la red; solo viajan los tres
+        # campos que realmente se imprimen
+        project={"_id": 0, "titulo": 1, "anio": 1, "autor_nombre": "$autor.nombre"}
+    )
+    # Formatear directamente desde el cursor y emitir un único print:
+    # evita una llamada a print (y su syscall) por documento.
+    # batch_size hace que el servidor transmita por lotes acotados en
+    # lugar de acumular un único lote gigante
+    salida = "\n".join(
+        f"- {libro['titulo']} ({libro['anio']}) - {libro.get('autor_nombre', 'Desconocido')}"
+        for libro in db["libros"].aggregate(pipeline, batchSize=1000)
+    )
+    if salida:
+        print(salida)
+
+def iter_libros(db: pymongo.database.Database):
+    """
+    Recorre la colección 'libros' como generador, con proyección y lotes
+    acotados: el consumidor procesa documento a documento mientras PyMongo
+    va pidiendo lotes de 500, de modo que la memoria usada no depende del
+    tamaño de la colección.
+
+    Args:
+        db: Objeto de conexión a la base de datos MongoDB
+
+    Yields:
+        Documentos con los campos titulo, anio y autor_id
+    """
+    yield from db["libros"].find(
+        {}, {"titulo": 1, "anio": 1, "autor_id": 1}
+    ).batch_size(500)
 
 def buscar_libros_por_autor(db: pymongo.database.Database, nombre_autor: str) -> List[Tuple[str, int]]:
     """
@@ -146,11 +257,26 @@ def buscar_libros_por_autor(db: pymongo.database.Database, nombre_autor: str) ->
     Returns:
         Lista de tuplas (titulo, anio)
     """
-    autor = db["autores"].find_one({"nombre": nombre_autor})
-    if not autor:
-        return []
-    libros = db["libros"].find({"autor_id": autor["_id"]})
-    return [(libro["titulo"], libro["anio"]) for libro in libros]
+    # Una sola agregación en lugar de dos consultas seriadas (find_one del
+    # autor + find de sus libros): el $match usa el índice de nombre, el
+    # $lookup el de autor_id, y el $project final limita lo que viaja por
+    # la red a los dos campos usados
+    pipeline = _construir_pipeline(
+        match={"nombre": nombre_autor},
+        etapas=[
+            {"$lookup": {
+                "from": "libros",
+                "localField": "_id",
+                "foreignField": "autor_id",
+                "as": "libros"
+            }},
+            {"$unwind": "$libros"},
+            {"$replaceRoot": {"newRoot": "$libros"}}
+        ],
+        project={"_id": 0, "titulo": 1, "anio": 1}
+    )
+    return [(libro["titulo"], libro["anio"])
+            for libro in db["autores"].aggregate(pipeline)]
 
 def actualizar_libro(
         db: pymongo.database.Database,
@@ -179,6 +305,9 @@ def actualizar_libro(
     if not update_doc:
         return True  # No hay campos para actualizar
 
+    # Los _id reales son ObjectId; aceptar también su forma de cadena
+    if isinstance(id_libro, str):
+        id_libro = ObjectId(id_libro)
     resultado = db["libros"].update_one({"_id": id_libro}, {"$set": update_doc})
     return resultado.modified_count > 0
 
@@ -196,6 +325,9 @@ def eliminar_libro(
     Returns:
         `True` si se eliminó correctamente, `False` si no se encontró el libro.
     """
+    # Los _id reales son ObjectId; aceptar también su forma de cadena
+    if isinstance(id_libro, str):
+        id_libro = ObjectId(id_libro)
     resultado = db["libros"].delete_one({"_id": id_libro})
     return resultado.deleted_count > 0
 
@@ -210,14 +342,26 @@ def ejemplo_transaccion(db: pymongo.database.Database) -> bool:
         `True` si la transacción se completó correctamente, `False` en caso de error.
     """
     try:
-        # Las transacciones requieren un clúster replicado o MongoDB 4.0+
-        # Para este ejemplo, usamos una operación simple sin transacción
-        # ya que MongoDB en memoria no soporta transacciones
+        # Las transacciones reales requieren un clúster replicado; el
+        # mongod inMemory de este ejercicio no las soporta, así que la
+        # "sección crítica" son solo las dos escrituras consecutivas.
+        # Todo lo demás (construcción de documentos, E/S de consola) se
+        # hace fuera de ella: en un despliegue con transacciones, cuanto
+        # menos dure la ventana entre start_transaction y commit, menos
+        # contención de bloqueos y menor presión sobre el oplog.
         print("Agregando nuevo autor y libro...")
-        nuevo_autor = {"nombre": "Nuevo Autor"}
-        autor_result = db["autores"].insert_one(nuevo_autor)
-        nuevo_libro = {"titulo": "Nuevo Libro", "anio": 2025, "autor_id": autor_result.inserted_id}
-        libro_result = db["libros"].insert_one(nuevo_libro)
+
+        # Preparación fuera de la sección crítica: generar el _id del
+        # autor en el cliente (el libro no depende del resultado del
+        # primer insert) y construir los lotes de cada colección
+        autor_id = ObjectId()
+        lote_autores = [InsertOne({"_id": autor_id, "nombre": "Nuevo Autor"})]
+        lote_libros = [InsertOne({"titulo": "Nuevo Libro", "anio": 2025, "autor_id": autor_id})]
+
+        # Sección crítica: solo las escrituras, una por colección
+        db["autores"].bulk_write(lote_autores, ordered=False)
+        db["libros"].bulk_write(lote_libros, ordered=False)
+
         print("Operaciones completadas sin transacción (no soportada en inMemory).")
         return True
     except Exception as e:
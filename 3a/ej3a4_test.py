@@ -8,6 +8,7 @@ import pymongo
 import os
 import shutil
 from bson.objectid import ObjectId
+from pymongo import WriteConcern
 from unittest.mock import patch, MagicMock
 
 from ej3a4 import (verificar_mongodb_instalado, iniciar_mongodb_en_memoria,
@@ -15,9 +16,13 @@ from ej3a4 import (verificar_mongodb_instalado, iniciar_mongodb_en_memoria,
                   consultar_libros, buscar_libros_por_autor, actualizar_libro,
                   eliminar_libro, ejemplo_transaccion, DB_NAME, MONGODB_PORT)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mongodb_proceso():
-    """Fixture que inicia una instancia de MongoDB en memoria para las pruebas"""
+    """Fixture que inicia una única instancia de MongoDB en memoria para toda la sesión de pruebas.
+
+    El fixture 'db' (de ámbito función) limpia las colecciones antes de cada
+    prueba, así que compartir el proceso no acopla las pruebas entre sí y
+    evita pagar el arranque de mongod una vez por prueba."""
     # Verificar si MongoDB está instalado
     if not verificar_mongodb_instalado():
         pytest.skip("MongoDB no está instalado, omitiendo pruebas")
@@ -59,25 +64,37 @@ def db_con_colecciones(db):
 
 @pytest.fixture
 def db_con_datos(db_con_colecciones):
-    """Fixture que proporciona una base de datos con colecciones y datos de ejemplo"""
-    # Insertar autores de ejemplo
-    autores = [
-        ("Gabriel García Márquez",),
-        ("Isabel Allende",),
-        ("Jorge Luis Borges",)
+    """Fixture que proporciona una base de datos con colecciones y datos de ejemplo.
+
+    Los datos de prueba se cargan con w=0 (escritura sin reconocimiento):
+    para datos desechables no hace falta esperar el ACK del servidor. La
+    lectura con reconocimiento del final hace de barrera para que las
+    pruebas vean los datos ya insertados."""
+    # Generar los _id en el cliente para poder referenciarlos desde libros
+    autor_ids = [ObjectId() for _ in range(3)]
+    autores_docs = [
+        {"_id": autor_ids[0], "nombre": "Gabriel García Márquez"},
+        {"_id": autor_ids[1], "nombre": "Isabel Allende"},
+        {"_id": autor_ids[2], "nombre": "Jorge Luis Borges"}
     ]
-    autor_ids = insertar_autores(db_con_colecciones, autores)
-
-    # Insertar libros de ejemplo
-    libros = [
-        ("Cien años de soledad", 1967, autor_ids[0]),
-        ("El amor en los tiempos del cólera", 1985, autor_ids[0]),
-        ("La casa de los espíritus", 1982, autor_ids[1]),
-        ("Eva Luna", 1987, autor_ids[1]),
-        ("Ficciones", 1944, autor_ids[2]),
-        ("El Aleph", 1949, autor_ids[2])
+    libros_docs = [
+        {"titulo": "Cien años de soledad", "anio": 1967, "autor_id": autor_ids[0]},
+        {"titulo": "El amor en los tiempos del cólera", "anio": 1985, "autor_id": autor_ids[0]},
+        {"titulo": "La casa de los espíritus", "anio": 1982, "autor_id": autor_ids[1]},
+        {"titulo": "Eva Luna", "anio": 1987, "autor_id": autor_ids[1]},
+        {"titulo": "Ficciones", "anio": 1944, "autor_id": autor_ids[2]},
+        {"titulo": "El Aleph", "anio": 1949, "autor_id": autor_ids[2]}
     ]
-    insertar_libros(db_con_colecciones, libros)
+
+    sin_ack = WriteConcern(w=0)
+    db_con_colecciones.get_collection("autores", write_concern=sin_ack).insert_many(
+        autores_docs, ordered=False)
+    db_con_colecciones.get_collection("libros", write_concern=sin_ack).insert_many(
+        libros_docs, ordered=False)
+
+    # Barrera: una lectura reconocida en la misma conexión garantiza que
+    # las escrituras anteriores ya se han aplicado
+    assert db_con_colecciones["libros"].count_documents({}) == len(libros_docs)
 
     return db_con_colecciones
 
@@ -160,3 +160,27 @@ def test_delete_nonexistent_book(client):
     """Test DELETE /books/<id> for a non-existent book"""
     response = client.delete("/books/999")
     assert response.status_code == 404
+
+def test_add_books_bulk(client):
+    """Test POST /books/bulk to add several books in one request"""
+    response = client.post("/books/bulk", json=[
+        {"title": "Paula", "author_id": 2, "year": 1994},
+        {"title": "Eva Luna", "author_id": 2}
+    ])
+    assert response.status_code == 201
+    assert response.json["inserted"] == 2
+
+    # Verify books were added
+    get_response = client.get("/books")
+    assert len(get_response.json) == 5
+    titles = [book["title"] for book in get_response.json]
+    assert "Paula" in titles
+    assert "Eva Luna" in titles
+
+def test_add_books_bulk_invalid_body(client):
+    """Test POST /books/bulk with a non-list body or missing fields"""
+    response = client.post("/books/bulk", json={"title": "No es una lista"})
+    assert response.status_code == 400
+
+    response = client.post("/books/bulk", json=[{"title": "Sin autor"}])
+    assert response.status_code == 400
@@ -115,3 +115,35 @@ def test_add_book_with_nonexistent_author(client):
     # This should fail with a 404 because the author doesn't exist
     assert response.status_code == 404
     assert "error" in response.json
+
+def test_add_authors_bulk(client):
+    """Test POST /authors/bulk to add several authors in one request"""
+    response = client.post("/authors/bulk", json=[
+        {"name": "Jorge Luis Borges"},
+        {"name": "Julio Cortázar"}
+    ])
+    assert response.status_code == 201
+    assert response.json["inserted"] == 2
+
+def test_add_books_bulk(client):
+    """Test POST /books/bulk to add several books in one request"""
+    response = client.post("/books/bulk", json=[
+        {"title": "Cien años de soledad", "author_id": 1, "year": 1967},
+        {"title": "Eva Luna", "author_id": 2}
+    ])
+    assert response.status_code == 201
+    assert response.json["inserted"] == 2
+
+def test_add_books_bulk_invalid(client):
+    """Test POST /books/bulk with schema violations and unknown authors"""
+    # Elemento que no cumple el esquema
+    response = client.post("/books/bulk", json=[{"title": "Sin autor"}])
+    assert response.status_code == 400
+    assert "error" in response.json
+
+    # Autor inexistente en el lote
+    response = client.post("/books/bulk", json=[
+        {"title": "Libro fantasma", "author_id": 999}
+    ])
+    assert response.status_code == 404
+    assert "error" in response.json
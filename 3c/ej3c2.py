@@ -13,19 +13,56 @@ Esta versión utiliza Flask para crear la API REST y PyJWT para trabajar con tok
 """
 
 import datetime
+import hashlib
+import hmac
+import json
+import time
 import jwt
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response
 from functools import wraps
 
 # Configuración JWT
 JWT_SECRET_KEY = "clave_secreta_jwt_para_firmar_tokens"  # En producción, usar una clave segura
 JWT_EXPIRATION_DELTA = datetime.timedelta(hours=1)  # Tiempo de expiración del token
+_JWT_EXPIRACION_SEGUNDOS = int(JWT_EXPIRATION_DELTA.total_seconds())
 
 # Credenciales de usuario fijas (en una aplicación real estarían en una base de datos)
 USER_CREDENTIALS = {
     "usuario_demo": "password123"
 }
 
+# Resúmenes SHA-256 precalculados de las contraseñas: la comparación en
+# login opera siempre sobre 32 bytes de longitud fija y en tiempo
+# constante (compare_digest), en lugar de un == de cadenas que
+# cortocircuita y filtra información de temporización
+_USUARIOS_DIGEST = {
+    usuario: hashlib.sha256(contrasena.encode('utf-8')).digest()
+    for usuario, contrasena in USER_CREDENTIALS.items()
+}
+
+# Constantes de verificación hoisted a nivel de módulo: evita crear la
+# lista de algoritmos y el diccionario de opciones en cada jwt.decode
+_JWT_ALGORITMOS = ('HS256',)
+_JWT_OPCIONES = {"require": ["exp", "sub"]}
+# Clave ya codificada a bytes: HMAC trabaja sobre bytes y así PyJWT no
+# repite str.encode en cada firma/verificación
+_JWT_CLAVE_BYTES = JWT_SECRET_KEY.encode('utf-8')
+
+# Cuerpos de error serializados una sola vez en el import: las ramas de
+# fallo de autenticación no pagan jsonify por solicitud rechazada
+_CUERPO_TOKEN_INVALIDO = json.dumps(
+    {"error": "Token inválido o ausente"}, ensure_ascii=False).encode('utf-8')
+_CUERPO_TOKEN_EXPIRADO = json.dumps(
+    {"error": "Token expirado"}, ensure_ascii=False).encode('utf-8')
+
+def _respuesta_error(cuerpo, codigo):
+    """
+    Devuelve una Response nueva sobre un cuerpo precalculado. El objeto
+    Response no se comparte entre solicitudes (sus cabeceras son
+    mutables); lo que se reutiliza son los bytes ya serializados.
+    """
+    return Response(cuerpo, status=codigo, mimetype='application/json')
+
 def generate_jwt_token(username):
     """
     Genera un token JWT para un usuario
@@ -40,13 +77,16 @@ def generate_jwt_token(username):
     # - 'sub' (subject): username
     # - 'iat' (issued at): Tiempo de emisión
     # - 'exp' (expiration): Tiempo de expiración
-    # Usa JWT_SECRET_KEY para firmar el token
+    # Usa JWT_SECRET_KEY para firmar el token.
+    # Un único instante en segundos de época: iat y exp son enteros que
+    # PyJWT acepta tal cual, sin construir dos datetime por emisión
+    ahora = int(time.time())
     payload = {
         'sub': username,
-        'iat': datetime.datetime.utcnow(),
-        'exp': datetime.datetime.utcnow() + JWT_EXPIRATION_DELTA
+        'iat': ahora,
+        'exp': ahora + _JWT_EXPIRACION_SEGUNDOS
     }
-    return jwt.encode(payload, JWT_SECRET_KEY, algorithm='HS256')
+    return jwt.encode(payload, _JWT_CLAVE_BYTES, algorithm='HS256')
 
 def jwt_required(func):
     """
@@ -75,29 +115,30 @@ def jwt_required(func):
 
         if not auth_header:
             # Si no hay cabecera de autorización, devolver error 401
-            return jsonify({"error": "Token inválido o ausente"}), 401
+            return _respuesta_error(_CUERPO_TOKEN_INVALIDO, 401)
 
-        try:
-            # Verificar que el formato sea 'Bearer TOKEN'
-            token_type, token = auth_header.split(' ', 1)
-            if token_type.lower() != 'bearer':
-                return jsonify({"error": "Token inválido o ausente"}), 401
+        # Verificar que el formato sea 'Bearer TOKEN': la comprobación de
+        # prefijo no crea la lista ni la cadena intermedia que generaban
+        # split + lower en cada solicitud autenticada
+        if not auth_header.startswith('Bearer '):
+            return _respuesta_error(_CUERPO_TOKEN_INVALIDO, 401)
+        token = auth_header[7:]
 
+        try:
             # Decodificar y verificar el token usando jwt.decode()
-            payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=['HS256'])
+            payload = jwt.decode(token, _JWT_CLAVE_BYTES,
+                                 algorithms=_JWT_ALGORITMOS,
+                                 options=_JWT_OPCIONES)
 
             # Si no hay errores, continuar con la función original
             return func(*args, **kwargs)
 
         except jwt.ExpiredSignatureError:
             # Token expirado
-            return jsonify({"error": "Token expirado"}), 401
+            return _respuesta_error(_CUERPO_TOKEN_EXPIRADO, 401)
         except jwt.InvalidTokenError:
             # Token inválido
-            return jsonify({"error": "Token inválido o ausente"}), 401
-        except ValueError:
-            # Formato incorrecto
-            return jsonify({"error": "Token inválido o ausente"}), 401
+            return _respuesta_error(_CUERPO_TOKEN_INVALIDO, 401)
 
     return decorated_function
 
@@ -165,11 +206,15 @@ def create_app():
         username = data['username']
         password = data['password']
 
-        # Verificar las credenciales
-        if USER_CREDENTIALS.get(username) == password:
+        # Verificar las credenciales comparando resúmenes de longitud fija
+        # en tiempo constante
+        esperado = _USUARIOS_DIGEST.get(username)
+        if esperado is not None and isinstance(password, str) and hmac.compare_digest(
+                esperado, hashlib.sha256(password.encode('utf-8')).digest()):
             # Si son correctas, generar un token JWT
             token = generate_jwt_token(username)
-            expires_at = datetime.datetime.utcnow() + JWT_EXPIRATION_DELTA
+            expires_at = datetime.datetime.fromtimestamp(
+                int(time.time()) + _JWT_EXPIRACION_SEGUNDOS, datetime.timezone.utc)
 
             # Devolver el token y la fecha de expiración
             return jsonify({